@@ -0,0 +1,31 @@
+# cython: boundscheck=False, wraparound=False, language_level=3
+"""C extension scan loop for DFA.run.
+
+Walks a uint8 symbol buffer through the flat int32 transition
+table at C speed; the GIL is released so batches of words can be
+scanned from multiple threads.
+"""
+
+
+cdef bint _scan(const int[::1] delta_flat, int n_sym, int q0,
+                const unsigned char[::1] syms,
+                const unsigned char[::1] final_mask,
+                const unsigned char[::1] dead_mask) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef int state_ = q0
+    for i in range(syms.shape[0]):
+        state_ = delta_flat[state_ * n_sym + syms[i]]
+        if dead_mask[state_]:
+            return False
+    return final_mask[state_] != 0
+
+
+def run_c(const int[::1] delta_flat, int n_sym, int q0,
+          const unsigned char[::1] syms,
+          const unsigned char[::1] final_mask,
+          const unsigned char[::1] dead_mask):
+    """Runs the scan loop without the GIL and returns acceptance."""
+    cdef bint result
+    with nogil:
+        result = _scan(delta_flat, n_sym, q0, syms, final_mask, dead_mask)
+    return bool(result)
@@ -20,10 +20,9 @@ class DFA :
     
     def run (self,w) :
         q = self.q0
-        while w!="" :
-            q = self.delta[(q,w[0])]
-            w = w[1:]
-        return q in self.F    
+        for c in w :
+            q = self.delta[(q,c)]
+        return q in self.F
     
     def minimize(self) :
         # return the minimal DFA
@@ -8,11 +8,62 @@ Created 19 Mar 2023 17:32:13
 
 from __future__ import annotations
 
-from copy import deepcopy
+from collections import deque
+from itertools import combinations
+
+import numpy as np
+
+try:
+    from _run import run_c as _run_c
+except ImportError:
+    _run_c = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _run_kernel(delta_flat, n_sym, q0, syms, final_mask, dead_mask):
+        """Walks a uint8 symbol array through a flat transition table."""
+        state_ = q0
+        for i in range(syms.shape[0]):
+            state_ = delta_flat[state_ * n_sym + syms[i]]
+            if dead_mask[state_]:
+                # no final state reachable, rest of the word is moot
+                return False
+        return final_mask[state_] != 0
+
+    @njit(cache=True, boundscheck=False, parallel=True)
+    def _run_batch_kernel(delta_flat, n_sym, q0, syms, offsets,
+                          final_mask, dead_mask, out):
+        """Scans one word per offset range, words in parallel."""
+        for w in prange(offsets.shape[0] - 1):
+            state_ = q0
+            rejected = False
+            for i in range(offsets[w], offsets[w + 1]):
+                state_ = delta_flat[state_ * n_sym + syms[i]]
+                if dead_mask[state_]:
+                    rejected = True
+                    break
+            out[w] = not rejected and final_mask[state_] != 0
+else:
+    _run_kernel = None
+    _run_batch_kernel = None
 
 
 class DFA:
 
+    # no per-instance __dict__: shrinks instances and makes the
+    # hot-path attribute loads in run() plain slot reads
+    __slots__ = (
+        'states', 'symbols', 'transitions', 'initial_state',
+        'final_states', '_n_symbols', '_sym_index',
+        '_sym_lut', '_delta', '_delta_flat', '_delta_b',
+        '_F_bits', '_final_u8', '_dead_bits', '_dead_u8', '_scan_py'
+    )
+
     def __init__(
         self, Q: set[int],
         Sigma: set[str],
@@ -30,12 +81,106 @@ class DFA:
                 {(current state, symbol): next state}
             q0 (str): Initial state
             F (set): Final states
+
+        Raises:
+            ValueError: If a symbol is not a single ASCII character.
         """
+        for symbol in Sigma:
+            if not isinstance(symbol, str) or len(symbol) != 1 \
+                    or ord(symbol) >= 128:
+                raise ValueError(
+                    f'symbols must be single ASCII characters: {symbol!r}'
+                )
         self.states = Q
         self.symbols = Sigma
         self.transitions = delta
         self.initial_state = q0
         self.final_states = F
+        self._compile()
+
+    def _compile(self) -> None:
+        """Precompiles the transition table for fast scanning.
+
+        Maps each symbol to a small integer id via str.translate,
+        and flattens the transition dictionary into a contiguous
+        row-major array indexed by [state, symbol id], so that
+        run() does no tuple building or dict hashing per character.
+        """
+        sym_order = sorted(self.symbols)
+        self._n_symbols = len(sym_order)
+        self._sym_index = {c: i for i, c in enumerate(sym_order)}
+        # symbol translation runs at the bytes level (Sigma is
+        # validated as single-char ASCII): bytes.translate is a
+        # dedicated C loop, with 255 as the not-in-Sigma sentinel
+        self._sym_lut = bytes(
+            self._sym_index.get(chr(i), 255) for i in range(256)
+        )
+        n_states = max(self.states) + 1
+        # -1 marks missing transitions (delta is total in practice)
+        self._delta = np.full((n_states, self._n_symbols), -1, np.int32)
+        for (state_, symbol_), next_ in self.transitions.items():
+            self._delta[state_, self._sym_index[symbol_]] = next_
+        self._delta_flat = self._delta.ravel()
+        # flat table for the pure-Python scan: bytes indexing yields
+        # cached small ints with no boxing; larger machines use a
+        # plain int list so the scan state stays a Python int and
+        # the bitmask shifts in run() can't overflow on NumPy scalars
+        if n_states <= 256 and int(self._delta_flat.min()) >= 0:
+            self._delta_b = self._delta_flat.astype(np.uint8).tobytes()
+        else:
+            self._delta_b = self._delta_flat.tolist()
+        # acceptance as a bit-vector: bit q set iff q is final
+        self._F_bits = 0
+        for q in self.final_states:
+            self._F_bits |= 1 << q
+        self._final_u8 = np.zeros(n_states, np.uint8)
+        self._final_u8[list(self.final_states)] = 1
+        # dead states: reverse reachability from the final states;
+        # entering one means the word can be rejected immediately
+        inv = {q: set() for q in self.states}
+        for (p, _), q in self.transitions.items():
+            inv[q].add(p)
+        alive = set(self.final_states)
+        frontier = deque(alive)
+        while frontier:
+            for p in inv[frontier.popleft()]:
+                if p not in alive:
+                    alive.add(p)
+                    frontier.append(p)
+        self._dead_bits = 0
+        for q in self.states - alive:
+            self._dead_bits |= 1 << q
+        self._dead_u8 = np.zeros(n_states, np.uint8)
+        self._dead_u8[list(self.states - alive)] = 1
+        # for tiny automata, generate a specialized pure-Python
+        # scanner with the constants baked in as literals, so the
+        # fallback loop carries no generic attribute or mask reads
+        if isinstance(self._delta_b, bytes) \
+                and n_states * self._n_symbols <= 64:
+            body = [
+                'def _scan(syms, _table=_T):',
+                f'    state_ = {self.initial_state}',
+                '    for b in syms:',
+                f'        state_ = _table[state_ * {self._n_symbols} + b]',
+            ]
+            if self._dead_bits:
+                body += [
+                    f'        if {self._dead_bits} >> state_ & 1:',
+                    '            return False',
+                ]
+            body.append(f'    return {self._F_bits} >> state_ & 1 != 0')
+            namespace = {}
+            exec('\n'.join(body), {'_T': self._delta_b}, namespace)
+            self._scan_py = namespace['_scan']
+        else:
+            self._scan_py = None
+        if _run_kernel is not None:
+            # warm-up call so the JIT compile cost is paid here,
+            # not on the first real run()
+            _run_kernel(
+                self._delta_flat, self._n_symbols, self.initial_state,
+                np.zeros(1, np.uint8), self._final_u8, self._dead_u8
+            )
 
     def __repr__(self) -> str:
         return (
@@ -44,22 +189,95 @@ class DFA:
             f'\n\t{self.final_states}\n)'
         )
 
-    def run(self, word: str) -> bool:
+    def _encode(self, word: str | bytes) -> bytes:
+        """Translates a word to symbol-id bytes.
+
+        Args:
+            word (str | bytes): The input word. bytes input skips
+                the str encode entirely.
+
+        Returns:
+            bytes: One symbol id per character.
+
+        Raises:
+            ValueError: If the word contains a symbol outside Sigma.
+        """
+        if isinstance(word, bytes):
+            syms = word.translate(self._sym_lut)
+        else:
+            try:
+                syms = word.encode('ascii').translate(self._sym_lut)
+            except UnicodeEncodeError:
+                raise ValueError(f'symbol not in Sigma: {word!r}') from None
+        if 255 in syms:
+            raise ValueError(f'symbol not in Sigma: {word!r}')
+        return syms
+
+    def run(self, word: str | bytes) -> bool:
         """Runs the defined automaton
 
         Args:
-            word (str): The input word
+            word (str | bytes): The input word
 
         Returns:
             bool: True if word is in the defined automata language,
             otherwise False
         """
-        self.state = self.initial_state
-        while word:
-            self.state = self.transitions[(self.state, word[0])]
-            word = word[1:]
+        syms = self._encode(word)
+        if _run_c is not None:
+            return _run_c(
+                self._delta_flat, self._n_symbols, self.initial_state,
+                np.frombuffer(syms, np.uint8), self._final_u8, self._dead_u8
+            )
+        if _run_kernel is not None:
+            return bool(_run_kernel(
+                self._delta_flat, self._n_symbols, self.initial_state,
+                np.frombuffer(syms, np.uint8), self._final_u8, self._dead_u8
+            ))
+        if self._scan_py is not None:
+            return self._scan_py(syms)
+        state_ = self.initial_state
+        table_ = self._delta_b
+        k = self._n_symbols
+        dead_ = self._dead_bits
+        if dead_:
+            for b in syms:
+                state_ = table_[state_ * k + b]
+                if (dead_ >> state_) & 1:
+                    return False
+        else:
+            for b in syms:
+                state_ = table_[state_ * k + b]
+
+        return (self._F_bits >> state_) & 1 != 0
 
-        return self.state in self.final_states
+    def run_batch(self, words: list[str]) -> np.ndarray:
+        """Runs the defined automaton over a batch of words.
+
+        Concatenates the batch, translates it to symbol ids in one
+        shot, and scans each word from its offset, so per-word
+        translation and dispatch overhead is paid once per batch.
+        With Numba available the words are scanned in parallel.
+
+        Args:
+            words (list[str]): The input words.
+
+        Returns:
+            np.ndarray: Boolean array, entry i True if words[i] is
+            in the defined automata language.
+        """
+        if _run_batch_kernel is None:
+            return np.array([self.run(word) for word in words], np.bool_)
+
+        offsets = np.zeros(len(words) + 1, np.int64)
+        np.cumsum([len(word) for word in words], out=offsets[1:])
+        syms = np.frombuffer(self._encode(''.join(words)), np.uint8)
+        out = np.zeros(len(words), np.bool_)
+        _run_batch_kernel(
+            self._delta_flat, self._n_symbols, self.initial_state,
+            syms, offsets, self._final_u8, self._dead_u8, out
+        )
+        return out
 
     def minimize(self) -> DFA:
         """Not used.
@@ -149,48 +367,290 @@ def run_dfa(dfa: DFA) -> bool:
     return dfa.run(word=word)
 
 
-def minimize_dfa(dfa: DFA):
+def minimize_dfa(dfa: DFA) -> DFA:
+    """Minimizes a DFA using Hopcroft's partition-refinement algorithm.
+
+    Refines the accepting/non-accepting split with a worklist of
+    splitter blocks over an inverse-transition index, running in
+    O(|Sigma| * n log n) instead of the O(|Sigma| * n^2) pair table.
+
+    Args:
+        dfa (DFA): The automaton to minimize.
+
+    Returns:
+        DFA: The minimized automaton. Each equivalence class is
+        merged into its smallest member state.
+    """
+    symbols = sorted(dfa.symbols)
+
+    # inverse transition index: inv[symbol][q] = {p: delta(p, symbol) == q}
+    inv = {symbol: {q: set() for q in dfa.states} for symbol in symbols}
+    for (p, symbol), q in dfa.transitions.items():
+        inv[symbol][q].add(p)
+
+    final = set(dfa.final_states)
+    nonfinal = dfa.states - final
+    partition = [block for block in (final, nonfinal) if block]
+    worklist = deque([min(partition, key=len)])
+
+    while worklist:
+        splitter = worklist.popleft()
+        for symbol in symbols:
+            # states reaching the splitter on this symbol
+            x = set()
+            for q in splitter:
+                x |= inv[symbol][q]
+
+            refined = []
+            for block in partition:
+                inter = block & x
+                diff = block - x
+                if inter and diff:
+                    refined += [inter, diff]
+                    if block in worklist:
+                        worklist.remove(block)
+                        worklist += [inter, diff]
+                    else:
+                        worklist.append(min(inter, diff, key=len))
+                else:
+                    refined.append(block)
+            partition = refined
+
+    # merges each equivalence class into its smallest member
+    rep = {}
+    for block in partition:
+        r = min(block)
+        for q in block:
+            rep[q] = r
+
+    min_transitions = {
+        (p, symbol): rep[q]
+        for (p, symbol), q in dfa.transitions.items()
+        if rep[p] == p
+    }
+
+    return DFA(
+        Q={rep[q] for q in dfa.states},
+        Sigma=set(dfa.symbols),
+        delta=min_transitions,
+        q0=rep[dfa.initial_state],
+        F={rep[q] for q in dfa.final_states}
+    )
+
+
+def _find(parent: dict[int, int], q: int) -> int:
+    """Finds the class representative of q, with path compression.
+
+    Args:
+        parent (dict[int, int]): Union-find parent links.
+        q (int): The state to look up.
+
+    Returns:
+        int: The representative of q's class.
+    """
+    root = q
+    while parent[root] != root:
+        root = parent[root]
+    while parent[q] != root:
+        parent[q], q = root, parent[q]
+    return root
+
+
+def _union(parent: dict[int, int], p: int, q: int) -> None:
+    """Merges the classes of p and q, keeping the smaller state as root.
+
+    Args:
+        parent (dict[int, int]): Union-find parent links.
+        p (int): First state.
+        q (int): Second state.
+    """
+    rp = _find(parent, p)
+    rq = _find(parent, q)
+    if rp != rq:
+        if rq < rp:
+            rp, rq = rq, rp
+        parent[rq] = rp
+
+
+def states_equivalent(dfa: DFA, p: int, q: int) -> bool:
+    """Tests whether two states accept the same language.
+
+    Hopcroft-Karp style: tentatively merge (p, q) with union-find
+    and chase transitions, rejecting as soon as a merged pair
+    disagrees on acceptance. Near-linear in |Sigma| * |Q| thanks to
+    the near-constant amortized find/union.
+
+    Args:
+        dfa (DFA): The automaton.
+        p (int): First state.
+        q (int): Second state.
+
+    Returns:
+        bool: True if p and q are indistinguishable.
+    """
+    parent = {state_: state_ for state_ in dfa.states}
+    stack = [(p, q)]
+    while stack:
+        r, s = stack.pop()
+        if (r in dfa.final_states) != (s in dfa.final_states):
+            return False
+        if _find(parent, r) == _find(parent, s):
+            continue
+        _union(parent, r, s)
+        for symbol in dfa.symbols:
+            stack.append(
+                (dfa.transitions[r, symbol], dfa.transitions[s, symbol])
+            )
+    return True
+
+
+def minimize_dfa_uf(dfa: DFA) -> DFA:
+    """Minimizes a DFA by union-find over equivalent state pairs.
+
+    Simpler than partition refinement when what's really wanted is
+    equivalence testing; each pairwise check is near-linear.
+
+    Args:
+        dfa (DFA): The automaton to minimize.
+
+    Returns:
+        DFA: The minimized automaton, classes merged into their
+        smallest member as in minimize_dfa().
+    """
+    parent = {q: q for q in dfa.states}
+    for p, q in combinations(sorted(dfa.states), 2):
+        if _find(parent, p) != _find(parent, q):
+            if states_equivalent(dfa, p, q):
+                _union(parent, p, q)
 
-    pairs = {}
+    rep = {q: _find(parent, q) for q in dfa.states}
+    min_transitions = {
+        (p, symbol): rep[q]
+        for (p, symbol), q in dfa.transitions.items()
+        if rep[p] == p
+    }
+
+    return DFA(
+        Q={rep[q] for q in dfa.states},
+        Sigma=set(dfa.symbols),
+        delta=min_transitions,
+        q0=rep[dfa.initial_state],
+        F={rep[q] for q in dfa.final_states}
+    )
+
+
+def minimize_dfa_moore(dfa: DFA) -> DFA:
+    """Minimizes a DFA by vectorized distinguishability refinement.
+
+    Moore-style fixpoint on a boolean |Q| x |Q| matrix: a pair
+    becomes distinguishable when its successors on some symbol
+    already are. Each pass gathers the whole matrix through the
+    successor index per symbol in one NumPy operation, so the
+    refinement runs at memory bandwidth instead of per-pair Python.
+
+    Args:
+        dfa (DFA): The automaton to minimize.
+
+    Returns:
+        DFA: The minimized automaton, classes merged into their
+        smallest member as in minimize_dfa().
+    """
     states = sorted(dfa.states)
-    n = 0
+    idx = {q: i for i, q in enumerate(states)}
+    n = len(states)
+    sym_order = sorted(dfa.symbols)
+
+    # successor index per (state, symbol), in matrix coordinates
+    delta_t = np.empty((n, len(sym_order)), np.int32)
+    for j, symbol in enumerate(sym_order):
+        for q in states:
+            delta_t[idx[q], j] = idx[dfa.transitions[q, symbol]]
+
+    in_final = np.fromiter(
+        (q in dfa.final_states for q in states), bool, n
+    )
+    marked = in_final[:, None] ^ in_final[None, :]
+
+    while True:
+        n_marked = int(marked.sum())
+        for j in range(len(sym_order)):
+            successors = delta_t[:, j]
+            marked |= marked[successors[:, None], successors[None, :]]
+        if int(marked.sum()) == n_marked:
+            break
+
+    # at fixpoint the unmarked pairs form the equivalence classes;
+    # each state's representative is its smallest equivalent state
+    rep = {
+        states[i]: states[int(np.flatnonzero(~marked[i])[0])]
+        for i in range(n)
+    }
+    min_transitions = {
+        (p, symbol): rep[q]
+        for (p, symbol), q in dfa.transitions.items()
+        if rep[p] == p
+    }
+
+    return DFA(
+        Q={rep[q] for q in dfa.states},
+        Sigma=set(dfa.symbols),
+        delta=min_transitions,
+        q0=rep[dfa.initial_state],
+        F={rep[q] for q in dfa.final_states}
+    )
+
+
+def minimize_dfa_tf(dfa: DFA) -> DFA:
+    """Minimizes a DFA with the classic table-filling algorithm.
+
+    Kept alongside minimize_dfa() for comparison; marks
+    distinguishable state pairs and merges the rest.
 
-    # creates list of all state-pairs
-    for r in states[:]:
-        for s in states[-1:n:-1]:
-            pairs[(r, s)] = 0
-        n += 1
+    Args:
+        dfa (DFA): The automaton to minimize.
+
+    Returns:
+        DFA: The minimized automaton.
+    """
+    # creates the table of distinct state pairs, smaller state first
+    pairs = dict.fromkeys(combinations(sorted(dfa.states), 2), 0)
 
     # marks all pairs containing final states
     for (r, s) in pairs.keys():
         if (r in dfa.final_states) ^ (s in dfa.final_states):
             pairs[(r, s)] = 1
 
-    # creates a list of marked state pairs, and a dictionary of unmarked pairs
-    marked = [key_ for key_ in pairs.keys() if pairs[key_]]
+    # creates a set of marked state pairs, and a dictionary of unmarked pairs
+    marked = {key_ for key_ in pairs.keys() if pairs[key_]}
     unmarked = {key_: [] for key_ in pairs.keys() if not pairs[key_]}
 
     def mark_pair(key_: tuple[int, int]) -> None:
-        """Marks a state pair and checks for any linked pairs to mark.
+        """Marks a state pair and any pairs recorded as linked to it.
+
+        Iterative worklist rather than recursion, so deep chains of
+        linked pairs can't hit the recursion limit and no KeyError
+        is raised per leaf.
 
         Args:
             key_ (tuple[int, int]): The state pair to mark [(r, s)].
         """
-        marked.append(unmarked[key_])
-        try:
-            for _ in unmarked[key_]:
-                mark_pair(_)
-        except KeyError:
-            pass
-        unmarked.pop(key_)
+        worklist = deque([key_])
+        while worklist:
+            pair_ = worklist.popleft()
+            marked.add(pair_)
+            worklist.extend(unmarked.pop(pair_, ()))
 
     # Checks all unmarked state pairs, with indeterminate pairs
     # being flagged for later marking.
-    unmarked_copy = deepcopy(unmarked)
-    for (r, s) in unmarked_copy.keys():
-        for symbol in sorted(dfa.symbols):
-            p = dfa.transitions[r, symbol]
-            q = dfa.transitions[s, symbol]
+    sym_order = sorted(dfa.symbols)
+    transitions = dfa.transitions
+    for (r, s) in list(unmarked):
+        for symbol in sym_order:
+            p = transitions[r, symbol]
+            q = transitions[s, symbol]
+            if p > q:
+                # pairs are keyed with the smaller state first
+                p, q = q, p
 
             if p == q:
                 # Same state, no info.
@@ -206,31 +666,35 @@ def minimize_dfa(dfa: DFA):
                 # Records the pair for deferred marking.
                 unmarked[(p, q)].append((r, s))
 
-    # Minimizes the dfa by removing extraneous states
-    # and redirecting states which point to them
-    min_transitions = deepcopy(dfa.transitions)
-    for (p, q) in unmarked.keys():
-        for key_, value_ in dfa.transitions.items():
-            if value_ == q:
-                min_transitions[key_] = p
-            if key_[0] == q:
-                min_transitions.pop(key_)
-                # for symbol_ in dfa.symbols:
-                #     print(f'popping: {q, symbol_}')
+    # the surviving unmarked pairs are the equivalent ones; union
+    # them into classes and merge each class into its smallest
+    # member, as in minimize_dfa()
+    parent = {q: q for q in dfa.states}
+    for (p, q) in unmarked:
+        _union(parent, p, q)
+
+    rep = {q: _find(parent, q) for q in dfa.states}
+    min_transitions = {
+        (p, symbol): rep[q]
+        for (p, symbol), q in dfa.transitions.items()
+        if rep[p] == p
+    }
 
     return DFA(
-        Q=dfa.states,
-        Sigma=dfa.symbols,
+        Q={rep[q] for q in dfa.states},
+        Sigma=set(dfa.symbols),
         delta=min_transitions,
-        q0=dfa.initial_state,
-        F=dfa.final_states
+        q0=rep[dfa.initial_state],
+        F={rep[q] for q in dfa.final_states}
     )
 
 
 def main():
 
+    prompt = f'Enter DFA number (0-{len(D)-1}) (X to exit): '
+    actions = {'1': run_dfa, '2': minimize_dfa}
     while True:
-        choice = input(f'Enter DFA number (0-{len(D)-1}) (X to exit): ')
+        choice = input(prompt).strip()
         try:
             choice = int(choice)
         except ValueError:
@@ -242,21 +706,18 @@ def main():
         if choice >= len(D):
             print('DFA does not exist.\n')
             break
-        else:
-            action = input(
-                f'D{choice} = {D[choice]}\n\n'
-                f'Enter choice: \n\n1: Run DFA\n2: Minimize DFA\nX: Exit\n\n'
-                f'or input anything else to go back: '
-            )
-            if action == '1':
-                result = run_dfa(D[choice])
-                print(result)
-            if action == '2':
-                min_dfa = minimize_dfa(D[choice])
-                print(min_dfa)
-            if action.lower() == 'x':
-                print('Goodbye.')
-                quit()
+
+        action = input(
+            f'D{choice} = {D[choice]}\n\n'
+            f'Enter choice: \n\n1: Run DFA\n2: Minimize DFA\nX: Exit\n\n'
+            f'or input anything else to go back: '
+        ).strip()
+        if action.lower() == 'x':
+            print('Goodbye.')
+            quit()
+        handler = actions.get(action)
+        if handler is not None:
+            print(handler(D[choice]))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""Builds the optional Cython scan extension.
+
+Usage:
+    python setup.py build_ext --inplace
+
+dfa_gf falls back to the Numba kernel or the pure Python loop when
+the extension hasn't been built.
+"""
+
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name='dfa_optimization',
+    ext_modules=cythonize('_run.pyx'),
+)